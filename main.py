@@ -1,9 +1,10 @@
 import logging
-import yaml
+import hashlib
 from pathlib import Path
 from datetime import datetime
 import pandas as pd
 
+from src.config import load_config
 from src.data.customer_data import CustomerDataGenerator, CustomerDataLoader
 from src.features.rfm_metrics import RFMCalculator
 from src.features.clv_calculator import CLVCalculator
@@ -18,8 +19,26 @@ def setup_logging(config):
     logger = logging.getLogger(__name__)
     return logger
 
+def get_cache_key(source_paths: tuple, config: dict) -> str:
+    """Build a cache key from the input files' metadata and CLV settings."""
+    parts = []
+    for path in source_paths:
+        stat = path.stat()
+        parts.append(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}")
+    parts.append(str(sorted(config['clv_calculation'].items())))
+    return hashlib.blake2b("|".join(parts).encode()).hexdigest()[:16]
+
 def generate_report(rfm_data: pd.DataFrame, output_path: Path):
     """Generate summary report in markdown format."""
+    # One grouped pass feeds both the segment counts and the performance table
+    segment_stats = rfm_data.groupby('Customer_Segment', observed=True).agg(
+        count=('clv', 'size'),
+        clv_mean=('clv', 'mean'),
+        clv_sum=('clv', 'sum'),
+        frequency_mean=('frequency', 'mean'),
+        monetary_avg_mean=('monetary_avg', 'mean')
+    ).round(2)
+    
     report = f"""
 # Customer Lifetime Value Analysis Report
 Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
@@ -28,7 +47,7 @@ Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Total Customers Analyzed: {len(rfm_data)}
 
 ## Customer Segments
-{rfm_data['Customer_Segment'].value_counts().to_markdown()}
+{segment_stats['count'].sort_values(ascending=False).to_markdown()}
 
 ## CLV Analysis
 - Average CLV: ${rfm_data['clv'].mean():.2f}
@@ -36,11 +55,7 @@ Total Customers Analyzed: {len(rfm_data)}
 - Total Expected CLV: ${rfm_data['clv'].sum():.2f}
 
 ## Segment Performance
-{rfm_data.groupby('Customer_Segment').agg({
-    'clv': ['count', 'mean', 'sum'],
-    'frequency': 'mean',
-    'monetary_avg': 'mean'
-}).round(2).to_markdown()}
+{segment_stats.to_markdown()}
 
 ## Recommendations
 1. Focus retention efforts on High-Value customers
@@ -54,8 +69,7 @@ Total Customers Analyzed: {len(rfm_data)}
 
 def main():
     # Load configuration
-    with open('config/config.yaml', 'r') as f:
-        config = yaml.safe_load(f)
+    config = load_config()
     
     # Setup logging
     logger = setup_logging(config)
@@ -63,39 +77,52 @@ def main():
     
     try:
         # Generate or load data
-        data_path = Path(config['paths']['data_dir']) / 'customers.csv'
-        if not data_path.exists():
+        data_loader = CustomerDataLoader()
+        if not all(path.exists() for path in data_loader.source_paths()):
             logger.info("Generating new customer data...")
             data_generator = CustomerDataGenerator()
             customers, transactions = data_generator.generate_dataset()
             data_generator.save_data(customers, transactions)
         else:
             logger.info("Loading existing customer data...")
-            data_loader = CustomerDataLoader()
             customers, transactions = data_loader.load_data()
             customers, transactions = data_loader.preprocess_data(customers, transactions)
         
+        # Cache RFM metrics and fitted models per version of the input files
+        cache_dir = Path(config['paths']['cache_dir'])
+        cache_dir.mkdir(exist_ok=True)
+        cache_key = get_cache_key(data_loader.source_paths(), config)
+        rfm_cache = cache_dir / f'{cache_key}_rfm.parquet'
+        models_cache = cache_dir / f'{cache_key}_models.pkl'
+        
         # Calculate RFM metrics
-        logger.info("Calculating RFM metrics...")
-        rfm_calculator = RFMCalculator()
-        rfm_data = rfm_calculator.calculate_rfm(transactions)
-        rfm_data = rfm_calculator.add_rfm_scores(rfm_data)
-        rfm_data = rfm_calculator.get_customer_segment(rfm_data)
+        if rfm_cache.exists():
+            logger.info("Loading cached RFM metrics...")
+            rfm_data = pd.read_parquet(rfm_cache)
+        else:
+            logger.info("Calculating RFM metrics...")
+            rfm_calculator = RFMCalculator()
+            rfm_data = rfm_calculator.calculate_rfm(transactions)
+            rfm_data = rfm_calculator.add_rfm_scores(rfm_data)
+            rfm_data = rfm_calculator.get_customer_segment(rfm_data)
+            rfm_data.to_parquet(rfm_cache, index=False)
         
         # Calculate CLV
         logger.info("Calculating Customer Lifetime Value...")
         clv_calculator = CLVCalculator()
-        clv_calculator.fit_models(rfm_data)
+        if models_cache.exists():
+            logger.info("Loading cached CLV models...")
+            clv_calculator.load_models(models_cache)
+        else:
+            clv_calculator.fit_models(rfm_data)
+            clv_calculator.save_models(models_cache)
         rfm_data = clv_calculator.predict_clv(rfm_data)
         rfm_data = clv_calculator.get_clv_segments(rfm_data)
         
         # Create visualizations
         logger.info("Generating visualizations...")
         visualizer = CustomerAnalyticsVisualizer()
-        visualizer.plot_rfm_distributions(rfm_data)
-        visualizer.plot_segment_characteristics(rfm_data)
-        visualizer.plot_clv_distribution(rfm_data)
-        visualizer.plot_retention_matrix(transactions)
+        visualizer.plot_all(rfm_data, transactions)
         
         # Generate report
         logger.info("Generating analysis report...")
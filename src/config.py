@@ -0,0 +1,11 @@
+import yaml
+from functools import lru_cache
+
+# Use the libyaml-backed loader when PyYAML was built with it
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+@lru_cache(maxsize=None)
+def load_config(config_path: str = "config/config.yaml") -> dict:
+    """Load the YAML configuration, parsing each file only once per process."""
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=_YamlLoader)
@@ -2,18 +2,35 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import logging
-import yaml
+from src.config import load_config
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Fixed category sets, shared by the generator and the loader so every
+# load path yields the same category order
+GENDER_DTYPE = pd.CategoricalDtype(['M', 'F'])
+INCOME_SEGMENT_DTYPE = pd.CategoricalDtype(['Low', 'Medium', 'High'])
+CATEGORY_DTYPE = pd.CategoricalDtype(['Electronics', 'Clothing', 'Food', 'Home', 'Other'])
+
+# Compact dtypes applied when loading saved data
+CUSTOMER_DTYPES = {
+    'customer_id': 'int32',
+    'gender': GENDER_DTYPE,
+    'income_segment': INCOME_SEGMENT_DTYPE
+}
+TRANSACTION_DTYPES = {
+    'customer_id': 'int32',
+    'amount': 'float32',
+    'category': CATEGORY_DTYPE
+}
+
 class CustomerDataGenerator:
     """Generates synthetic customer transaction data for analysis."""
     
     def __init__(self, config_path: str = "config/config.yaml"):
         """Initialize the data generator with configuration."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
         
         np.random.seed(self.config['data']['random_seed'])
         self.n_customers = self.config['data']['n_customers']
@@ -28,49 +45,53 @@ class CustomerDataGenerator:
                 freq='D'
             ).map(lambda x: x + pd.Timedelta(days=np.random.randint(0, 30))),
             'age': np.random.normal(45, 15, self.n_customers).round().clip(18, 90),
-            'gender': np.random.choice(['M', 'F'], self.n_customers),
-            'income_segment': np.random.choice(['Low', 'Medium', 'High'], self.n_customers,
-                                            p=[0.3, 0.5, 0.2])
+            'gender': pd.Categorical(
+                np.random.choice(GENDER_DTYPE.categories, self.n_customers),
+                dtype=GENDER_DTYPE
+            ),
+            'income_segment': pd.Categorical(
+                np.random.choice(INCOME_SEGMENT_DTYPE.categories, self.n_customers,
+                                 p=[0.3, 0.5, 0.2]),
+                dtype=INCOME_SEGMENT_DTYPE
+            )
         })
         return customers
     
     def generate_transactions(self, customers: pd.DataFrame) -> pd.DataFrame:
         """Generate transaction history for customers."""
-        transactions = []
-        
-        for _, customer in customers.iterrows():
-            # Number of transactions follows a Poisson distribution
-            n_transactions = np.random.poisson(5)
-            
-            if n_transactions > 0:
-                for _ in range(n_transactions):
-                    # Days since first purchase follows exponential distribution
-                    days_since_first = np.random.exponential(30)
-                    transaction_date = customer['first_purchase'] + pd.Timedelta(days=days_since_first)
-                    
-                    # Transaction amount based on income segment
-                    base_amount = {
-                        'Low': 50,
-                        'Medium': 100,
-                        'High': 200
-                    }[customer['income_segment']]
-                    
-                    amount = np.random.lognormal(
-                        np.log(base_amount),
-                        0.5
-                    )
-                    
-                    transactions.append({
-                        'customer_id': customer['customer_id'],
-                        'transaction_date': transaction_date,
-                        'amount': round(amount, 2),
-                        'category': np.random.choice(
-                            ['Electronics', 'Clothing', 'Food', 'Home', 'Other'],
-                            p=[0.2, 0.3, 0.25, 0.15, 0.1]
-                        )
-                    })
-        
-        return pd.DataFrame(transactions)
+        # Number of transactions per customer follows a Poisson distribution
+        counts = np.random.poisson(5, len(customers))
+        total = counts.sum()
+        
+        customer_ids = np.repeat(customers['customer_id'].to_numpy(), counts)
+        first_purchase = np.repeat(customers['first_purchase'].to_numpy(), counts)
+        
+        # Days since first purchase follows exponential distribution
+        days_since_first = np.random.exponential(30, total)
+        transaction_dates = first_purchase + pd.to_timedelta(days_since_first, unit='D').to_numpy()
+        
+        # Transaction amount based on income segment
+        base_amount = np.repeat(
+            customers['income_segment'].map({
+                'Low': 50,
+                'Medium': 100,
+                'High': 200
+            }).to_numpy(dtype=float),
+            counts
+        )
+        amounts = np.round(np.random.lognormal(np.log(base_amount), 0.5), 2)
+        
+        categories = pd.Categorical(
+            np.random.choice(CATEGORY_DTYPE.categories, total, p=[0.2, 0.3, 0.25, 0.15, 0.1]),
+            dtype=CATEGORY_DTYPE
+        )
+        
+        return pd.DataFrame({
+            'customer_id': customer_ids,
+            'transaction_date': transaction_dates,
+            'amount': amounts,
+            'category': categories
+        })
     
     def generate_dataset(self) -> tuple:
         """Generate complete customer and transaction datasets."""
@@ -90,6 +111,10 @@ class CustomerDataGenerator:
         
         customers.to_csv(data_dir / 'customers.csv', index=False)
         transactions.to_csv(data_dir / 'transactions.csv', index=False)
+        
+        # Parquet copies are typed and columnar, so reloading skips CSV parsing
+        customers.to_parquet(data_dir / 'customers.parquet', index=False)
+        transactions.to_parquet(data_dir / 'transactions.parquet', index=False)
         logger.info("Data saved successfully")
 
 class CustomerDataLoader:
@@ -97,36 +122,70 @@ class CustomerDataLoader:
     
     def __init__(self, config_path: str = "config/config.yaml"):
         """Initialize the data loader with configuration."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
+    
+    def source_paths(self) -> tuple:
+        """Return the customer and transaction files load_data reads, preferring Parquet."""
+        data_dir = Path(self.config['paths']['data_dir'])
+        
+        paths = []
+        for name in ['customers', 'transactions']:
+            parquet_path = data_dir / f'{name}.parquet'
+            paths.append(parquet_path if parquet_path.exists() else data_dir / f'{name}.csv')
+        
+        return tuple(paths)
     
     def load_data(self) -> tuple:
         """Load customer and transaction data from files."""
-        data_dir = Path(self.config['paths']['data_dir'])
+        customers_path, transactions_path = self.source_paths()
         
-        customers = pd.read_csv(
-            data_dir / 'customers.csv',
-            parse_dates=['first_purchase']
-        )
+        if customers_path.suffix == '.parquet':
+            customers = pd.read_parquet(customers_path).astype(CUSTOMER_DTYPES)
+        else:
+            customers = pd.read_csv(
+                customers_path,
+                engine='pyarrow',
+                parse_dates=['first_purchase'],
+                dtype=CUSTOMER_DTYPES
+            )
         
-        transactions = pd.read_csv(
-            data_dir / 'transactions.csv',
-            parse_dates=['transaction_date']
-        )
+        if transactions_path.suffix == '.parquet':
+            transactions = pd.read_parquet(transactions_path).astype(TRANSACTION_DTYPES)
+        else:
+            transactions = self._read_transactions_csv(
+                transactions_path,
+                customers['customer_id'].to_numpy()
+            )
         
         return customers, transactions
     
+    def _read_transactions_csv(self, path: Path, valid_ids: np.ndarray) -> pd.DataFrame:
+        """Stream the transactions CSV in chunks, dropping duplicates and unknown customers early."""
+        chunks = []
+        for chunk in pd.read_csv(
+            path,
+            chunksize=self.config['data']['chunksize'],
+            parse_dates=['transaction_date'],
+            dtype=TRANSACTION_DTYPES
+        ):
+            chunk = chunk.loc[~chunk.duplicated()]
+            chunk = chunk[np.isin(chunk['customer_id'].to_numpy(), valid_ids)]
+            chunks.append(chunk)
+        
+        # Every chunk shares the fixed category dtype, so concat keeps it categorical
+        return pd.concat(chunks, ignore_index=True)
+    
     def preprocess_data(self, customers: pd.DataFrame, transactions: pd.DataFrame) -> tuple:
         """Preprocess the data for analysis."""
-        # Remove duplicates
-        transactions = transactions.drop_duplicates()
-        
         # Sort transactions by date
-        transactions = transactions.sort_values('transaction_date')
+        transactions = transactions.sort_values('transaction_date', kind='stable', ignore_index=True)
         
-        # Ensure all transactions have valid customer IDs
-        transactions = transactions[
-            transactions['customer_id'].isin(customers['customer_id'])
-        ]
+        # Remove duplicates and ensure all transactions have valid customer IDs;
+        # a boolean mask keeps the date order on every pandas version
+        keep = ~transactions.duplicated().to_numpy() & np.isin(
+            transactions['customer_id'].to_numpy(),
+            customers['customer_id'].to_numpy()
+        )
+        transactions = transactions.loc[keep].reset_index(drop=True)
         
         return customers, transactions
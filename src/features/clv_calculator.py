@@ -2,7 +2,9 @@ import pandas as pd
 import numpy as np
 from lifetimes import BetaGeoFitter, GammaGammaFitter
 import logging
-import yaml
+import joblib
+from pathlib import Path
+from src.config import load_config
 
 logger = logging.getLogger(__name__)
 
@@ -11,81 +13,118 @@ class CLVCalculator:
     
     def __init__(self, config_path: str = "config/config.yaml"):
         """Initialize the CLV calculator with configuration."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
         
         self.bgf_model = None
         self.ggf_model = None
     
+    def _model_inputs(self, rfm: pd.DataFrame) -> tuple:
+        """Upcast the compact RFM columns to float64 for the lifetimes fitters."""
+        return (
+            rfm['frequency'].astype(np.float64),
+            rfm['recency'].astype(np.float64),
+            rfm['T'].astype(np.float64),
+            rfm['monetary_avg'].astype(np.float64)
+        )
+    
     def fit_models(self, rfm: pd.DataFrame):
         """Fit BG/NBD and Gamma-Gamma models."""
         logger.info("Fitting BG/NBD model...")
         self.bgf_model = BetaGeoFitter(
             penalizer_coef=self.config['clv_calculation']['penalizer_coef']
         )
-        self.bgf_model.fit(
-            rfm['frequency'],
-            rfm['recency'],
-            rfm['T']
+        # Plain contiguous arrays skip the pandas wrappers on the fit path
+        frequency, recency, T, monetary_avg = (
+            column.to_numpy() for column in self._model_inputs(rfm)
         )
+        self.bgf_model.fit(frequency, recency, T)
         
         # Only fit Gamma-Gamma model for customers with purchases
-        mask = rfm['frequency'] > 0
+        mask = frequency > 0
         
         logger.info("Fitting Gamma-Gamma model...")
         self.ggf_model = GammaGammaFitter(
             penalizer_coef=self.config['clv_calculation']['penalizer_coef']
         )
-        self.ggf_model.fit(
-            rfm.loc[mask, 'frequency'],
-            rfm.loc[mask, 'monetary_avg']
+        self.ggf_model.fit(frequency[mask], monetary_avg[mask])
+    
+    def save_models(self, path: Path):
+        """Persist the fitted model parameters so later runs can skip fitting."""
+        if self.bgf_model is None or self.ggf_model is None:
+            raise ValueError("Models must be fit before saving")
+        
+        joblib.dump({'bgf': self.bgf_model.params_, 'ggf': self.ggf_model.params_}, path)
+    
+    def load_models(self, path: Path):
+        """Restore previously fitted model parameters without refitting."""
+        params = joblib.load(path)
+        
+        self.bgf_model = BetaGeoFitter(
+            penalizer_coef=self.config['clv_calculation']['penalizer_coef']
+        )
+        self.bgf_model.params_ = params['bgf']
+        # fit() normally sets this alias, which customer_lifetime_value relies on
+        self.bgf_model.predict = self.bgf_model.conditional_expected_number_of_purchases_up_to_time
+        
+        self.ggf_model = GammaGammaFitter(
+            penalizer_coef=self.config['clv_calculation']['penalizer_coef']
         )
+        self.ggf_model.params_ = params['ggf']
     
     def predict_clv(self, rfm: pd.DataFrame) -> pd.DataFrame:
         """Predict customer lifetime value."""
         if self.bgf_model is None or self.ggf_model is None:
             raise ValueError("Models must be fit before predicting CLV")
         
+        frequency, recency, T, monetary_avg = self._model_inputs(rfm)
+        
         # Predict future transactions
         logger.info("Predicting future transactions...")
         predicted_transactions = self.bgf_model.predict(
             self.config['clv_calculation']['time_period'],
-            rfm['frequency'],
-            rfm['recency'],
-            rfm['T']
+            frequency,
+            recency,
+            T
         )
         
         # Calculate expected average profit
         logger.info("Calculating customer lifetime value...")
         clv = self.ggf_model.customer_lifetime_value(
             self.bgf_model,
-            rfm['frequency'],
-            rfm['recency'],
-            rfm['T'],
-            rfm['monetary_avg'],
+            frequency,
+            recency,
+            T,
+            monetary_avg,
             time=self.config['clv_calculation']['time_period'],
             discount_rate=self.config['clv_calculation']['discount_rate']
         )
         
-        # Add predictions to RFM dataframe
-        rfm['predicted_transactions'] = predicted_transactions
-        rfm['clv'] = clv
+        # Add predictions to RFM dataframe, stored compactly like the RFM metrics
+        rfm['predicted_transactions'] = np.asarray(predicted_transactions, dtype=np.float32)
+        rfm['clv'] = np.asarray(clv, dtype=np.float32)
         
         return rfm
     
     def get_clv_segments(self, rfm: pd.DataFrame) -> pd.DataFrame:
         """Segment customers based on CLV predictions."""
-        rfm['clv_segment'] = pd.qcut(
-            rfm['clv'],
-            q=4,
-            labels=['Low Value', 'Medium Value', 'High Value', 'Top Value']
+        clv = rfm['clv'].to_numpy(dtype=float)
+        
+        # Quartile bins are right-inclusive, matching pd.qcut
+        edges = np.nanquantile(clv, [0.25, 0.5, 0.75])
+        codes = np.searchsorted(edges, clv, side='left')
+        codes[np.isnan(clv)] = -1
+        
+        rfm['clv_segment'] = pd.Categorical.from_codes(
+            codes,
+            categories=['Low Value', 'Medium Value', 'High Value', 'Top Value'],
+            ordered=True
         )
         
         return rfm
     
     def get_clv_summary(self, rfm: pd.DataFrame) -> pd.DataFrame:
         """Generate summary statistics for CLV segments."""
-        summary = rfm.groupby('clv_segment').agg({
+        summary = rfm.groupby('clv_segment', observed=True).agg({
             'clv': ['count', 'mean', 'min', 'max', 'sum'],
             'frequency': 'mean',
             'monetary_avg': 'mean'
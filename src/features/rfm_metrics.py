@@ -2,94 +2,203 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import logging
-import yaml
+from src.config import load_config
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional, fall back to pandas groupby
+    njit = None
+    prange = range
 
 logger = logging.getLogger(__name__)
 
+# Counts and day spans stay int32: astype wraps silently, and both can exceed
+# the int16 range (e.g. an analysis_date far from the data)
+RFM_DTYPES = {
+    'customer_id': 'int32',
+    'recency': 'int32',
+    'frequency': 'int32',
+    'monetary_sum': 'float32',
+    'monetary_avg': 'float32',
+    'T': 'int32'
+}
+
+def _rfm_kernel(starts, timestamps, amounts, out_first, out_last, out_sum, out_valid):
+    """Reduce contiguous runs of customer-sorted transactions to per-customer stats.
+    
+    Missing amounts are skipped in the sum and in the valid count, like pandas sum/mean.
+    """
+    for g in prange(len(starts) - 1):
+        lo = starts[g]
+        hi = starts[g + 1]
+        first = timestamps[lo]
+        last = timestamps[lo]
+        total = 0.0
+        valid = 0
+        for i in range(lo, hi):
+            if timestamps[i] < first:
+                first = timestamps[i]
+            if timestamps[i] > last:
+                last = timestamps[i]
+            if not np.isnan(amounts[i]):
+                total += amounts[i]
+                valid += 1
+        out_first[g] = first
+        out_last[g] = last
+        out_sum[g] = total
+        out_valid[g] = valid
+
+if njit is not None:
+    _rfm_kernel = njit(parallel=True, cache=True)(_rfm_kernel)
+
+def _score(values: np.ndarray, edges, reverse: bool = False) -> np.ndarray:
+    """Map values onto 1-4 scores using right-inclusive bin edges, like pd.cut."""
+    scores = np.searchsorted(edges, values, side='left').astype(np.int8) + 1
+    return 5 - scores if reverse else scores
+
+# Packed RFM scores that qualify as Best Customers
+BEST_CUSTOMER_SCORES = np.array([444, 434, 443, 433], dtype=np.int16)
+
 class RFMCalculator:
     """Calculates RFM (Recency, Frequency, Monetary) metrics for customers."""
     
     def __init__(self, config_path: str = "config/config.yaml"):
         """Initialize the RFM calculator with configuration."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config = load_config(config_path)
     
     def calculate_rfm(self, transactions: pd.DataFrame, analysis_date: datetime = None) -> pd.DataFrame:
         """Calculate RFM metrics for each customer."""
         if analysis_date is None:
             analysis_date = transactions['transaction_date'].max() + pd.Timedelta(days=1)
+        analysis_date = pd.Timestamp(analysis_date)
         
         logger.info(f"Calculating RFM metrics as of {analysis_date}")
         
-        # Calculate recency, frequency, and monetary value for each customer
-        rfm = transactions.groupby('customer_id').agg({
-            'transaction_date': lambda x: (analysis_date - x.max()).days,  # Recency
-            'customer_id': 'count',  # Frequency
-            'amount': ['sum', 'mean']  # Monetary
-        })
+        if njit is not None:
+            rfm = self._aggregate_numba(transactions)
+        else:
+            rfm = self._aggregate_pandas(transactions)
         
-        # Flatten column names
-        rfm.columns = ['recency', 'frequency', 'monetary_sum', 'monetary_avg']
-        rfm = rfm.reset_index()
+        # Recency and T (time since first purchase) in days
+        rfm['recency'] = (analysis_date - rfm['last_purchase']).dt.days
+        rfm['T'] = (analysis_date - rfm['first_purchase']).dt.days
         
-        # Add T (time since first purchase)
-        first_purchase = transactions.groupby('customer_id')['transaction_date'].min()
-        rfm['T'] = (analysis_date - first_purchase).dt.days
+        # Downcast to compact dtypes to halve memory traffic downstream
+        rfm = rfm.reindex(
+            columns=['customer_id', 'recency', 'frequency', 'monetary_sum', 'monetary_avg', 'T']
+        ).astype(RFM_DTYPES)
         
         logger.info("RFM metrics calculated successfully")
         return rfm
     
+    def _aggregate_pandas(self, transactions: pd.DataFrame) -> pd.DataFrame:
+        """Aggregate per-customer purchase statistics with a single groupby pass."""
+        return transactions.groupby('customer_id', sort=False, observed=True).agg(
+            last_purchase=('transaction_date', 'max'),
+            first_purchase=('transaction_date', 'min'),
+            frequency=('amount', 'size'),  # every transaction, even without an amount
+            monetary_sum=('amount', 'sum'),
+            monetary_avg=('amount', 'mean')
+        ).reset_index()
+    
+    def _aggregate_numba(self, transactions: pd.DataFrame) -> pd.DataFrame:
+        """Aggregate per-customer purchase statistics with the compiled RFM kernel."""
+        customer_ids = transactions['customer_id'].to_numpy()
+        if len(customer_ids) == 0:
+            # The kernel assumes at least one run, so return the empty result directly
+            return pd.DataFrame({
+                'customer_id': customer_ids,
+                'last_purchase': np.array([], dtype='datetime64[ns]'),
+                'first_purchase': np.array([], dtype='datetime64[ns]'),
+                'frequency': np.array([], dtype=np.int64),
+                'monetary_sum': np.array([], dtype=np.float64),
+                'monetary_avg': np.array([], dtype=np.float64)
+            })
+        
+        order = np.argsort(customer_ids, kind='stable')
+        customer_ids = customer_ids[order]
+        timestamps = transactions['transaction_date'].to_numpy('datetime64[ns]').view(np.int64)[order]
+        amounts = transactions['amount'].to_numpy(np.float64)[order]
+        
+        # Boundaries of each customer's run in the sorted arrays
+        boundaries = np.flatnonzero(customer_ids[1:] != customer_ids[:-1]) + 1
+        starts = np.concatenate(([0], boundaries, [len(customer_ids)]))
+        n_customers = len(starts) - 1
+        
+        first = np.empty(n_customers, dtype=np.int64)
+        last = np.empty(n_customers, dtype=np.int64)
+        total = np.empty(n_customers, dtype=np.float64)
+        valid = np.empty(n_customers, dtype=np.int64)
+        _rfm_kernel(starts, timestamps, amounts, first, last, total, valid)
+        
+        # Frequency counts every transaction; the average only covers known amounts
+        frequency = np.diff(starts)
+        monetary_avg = np.full(n_customers, np.nan)
+        np.divide(total, valid, out=monetary_avg, where=valid > 0)
+        return pd.DataFrame({
+            'customer_id': customer_ids[starts[:-1]],
+            'last_purchase': last.view('datetime64[ns]'),
+            'first_purchase': first.view('datetime64[ns]'),
+            'frequency': frequency,
+            'monetary_sum': total,
+            'monetary_avg': monetary_avg
+        })
+    
     def add_rfm_scores(self, rfm: pd.DataFrame, quartiles: bool = True) -> pd.DataFrame:
         """Add RFM scores (1-4) for each metric."""
+        recency = rfm['recency'].to_numpy()
+        frequency = rfm['frequency'].to_numpy()
+        monetary = rfm['monetary_avg'].to_numpy()
+        
         if quartiles:
             # Use quartiles for scoring
-            r_labels = range(4, 0, -1)  # 4 is best (lowest recency)
-            f_labels = range(1, 5)  # 4 is best (highest frequency)
-            m_labels = range(1, 5)  # 4 is best (highest monetary)
-            
-            r_quartiles = pd.qcut(rfm['recency'], q=4, labels=r_labels)
-            f_quartiles = pd.qcut(rfm['frequency'], q=4, labels=f_labels)
-            m_quartiles = pd.qcut(rfm['monetary_avg'], q=4, labels=m_labels)
-            
-            rfm['R_score'] = r_quartiles
-            rfm['F_score'] = f_quartiles
-            rfm['M_score'] = m_quartiles
+            r_edges = np.quantile(recency, [0.25, 0.5, 0.75])
+            f_edges = np.quantile(frequency, [0.25, 0.5, 0.75])
+            m_edges = np.quantile(monetary, [0.25, 0.5, 0.75])
         else:
             # Use manual breaks (customize as needed)
-            rfm['R_score'] = pd.cut(rfm['recency'], 
-                                  bins=[0, 7, 30, 90, float('inf')],
-                                  labels=[4, 3, 2, 1])
-            
-            rfm['F_score'] = pd.cut(rfm['frequency'],
-                                  bins=[0, 2, 5, 10, float('inf')],
-                                  labels=[1, 2, 3, 4])
-            
-            rfm['M_score'] = pd.cut(rfm['monetary_avg'],
-                                  bins=[0, 100, 250, 500, float('inf')],
-                                  labels=[1, 2, 3, 4])
-        
-        # Calculate RFM Score
-        rfm['RFM_Score'] = rfm['R_score'].astype(str) + \
-                          rfm['F_score'].astype(str) + \
-                          rfm['M_score'].astype(str)
+            r_edges = [7, 30, 90]
+            f_edges = [2, 5, 10]
+            m_edges = [100, 250, 500]
+        
+        r_score = _score(recency, r_edges, reverse=True)  # 4 is best (lowest recency)
+        f_score = _score(frequency, f_edges)  # 4 is best (highest frequency)
+        m_score = _score(monetary, m_edges)  # 4 is best (highest monetary)
+        
+        rfm['R_score'] = r_score
+        rfm['F_score'] = f_score
+        rfm['M_score'] = m_score
+        
+        # Pack the RFM Score into one integer, e.g. R=4, F=3, M=2 -> 432
+        rfm['RFM_Score'] = r_score.astype(np.int16) * 100 + f_score * 10 + m_score
         
         return rfm
     
     def get_customer_segment(self, rfm: pd.DataFrame) -> pd.DataFrame:
         """Assign customer segments based on RFM scores."""
-        def segment_customer(row):
-            if row['RFM_Score'] in ['444', '434', '443', '433']:
-                return 'Best Customers'
-            elif row['R_score'] == 4:
-                return 'Recent Customers'
-            elif row['F_score'] == 4:
-                return 'Loyal Customers'
-            elif row['M_score'] == 4:
-                return 'Big Spenders'
-            elif row['R_score'] == 1:
-                return 'Lost Customers'
-            else:
-                return 'Average Customers'
-        
-        rfm['Customer_Segment'] = rfm.apply(segment_customer, axis=1)
+        rfm_score = rfm['RFM_Score'].to_numpy(np.int16)
+        r_score = rfm['R_score'].to_numpy(np.int8)
+        f_score = rfm['F_score'].to_numpy(np.int8)
+        m_score = rfm['M_score'].to_numpy(np.int8)
+        
+        # Conditions are evaluated in priority order, first match wins
+        conditions = [
+            np.isin(rfm_score, BEST_CUSTOMER_SCORES),
+            r_score == 4,
+            f_score == 4,
+            m_score == 4,
+            r_score == 1
+        ]
+        segments = [
+            'Best Customers',
+            'Recent Customers',
+            'Loyal Customers',
+            'Big Spenders',
+            'Lost Customers'
+        ]
+        
+        rfm['Customer_Segment'] = pd.Categorical(
+            np.select(conditions, segments, default='Average Customers'),
+            categories=segments + ['Average Customers']
+        )
         return rfm
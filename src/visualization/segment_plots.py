@@ -1,33 +1,111 @@
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Render straight to files, no interactive backend needed
 import matplotlib.pyplot as plt
+from matplotlib import font_manager
+from matplotlib.figure import Figure
 import seaborn as sns
-import yaml
+from src.config import load_config
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Per-process state for plot workers, filled once by _init_plot_worker
+_worker_state = {}
+
+def _init_plot_worker(config_path: str, rfm_data: pd.DataFrame):
+    """Build the worker's visualizer and keep the RFM frame shared by most plots."""
+    _worker_state['visualizer'] = CustomerAnalyticsVisualizer(config_path)
+    _worker_state['rfm_data'] = rfm_data
+
+def _render_plot(method_name: str, data: pd.DataFrame = None):
+    """Render a single plot in a worker process, defaulting to the worker's RFM frame."""
+    if data is None:
+        data = _worker_state['rfm_data']
+    getattr(_worker_state['visualizer'], method_name)(data)
+
 class CustomerAnalyticsVisualizer:
     """Creates visualizations for customer analytics insights."""
     
     def __init__(self, config_path: str = "config/config.yaml"):
         """Initialize the visualizer with configuration."""
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        self.config_path = config_path
+        self.config = load_config(config_path)
             
         # Set style parameters
         plt.style.use(self.config['visualization']['style'])
+        plt.rcParams['path.simplify_threshold'] = 1.0
+        plt.rcParams['agg.path.chunksize'] = 10000
         self.figure_size = self.config['visualization']['figure_size']
-        self.dpi = self.config['visualization']['dpi']
+        # Exploratory runs trade resolution for faster rendering and encoding
+        if self.config['visualization']['exploratory']:
+            self.dpi = self.config['visualization']['exploratory_dpi']
+        else:
+            self.dpi = self.config['visualization']['dpi']
+        
+        # Resolve the default font once up front so the first plot skips the lookup
+        font_manager.findfont(font_manager.FontProperties(family=plt.rcParams['font.family']))
         
         # Create figures directory if it doesn't exist
         self.figures_dir = Path(self.config['paths']['figures_dir'])
         self.figures_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Single figure reused by every plot, cleared between calls; created outside
+        # pyplot so it is not tracked by (or leaked into) pyplot's figure manager
+        self.fig = Figure(figsize=self.figure_size)
+    
+    def _new_axes(self, nrows: int = 1, ncols: int = 1):
+        """Clear the shared figure and lay out a fresh grid of axes."""
+        self.fig.clear()
+        return self.fig.subplots(nrows, ncols)
+    
+    def _save(self, filename: str):
+        """Save the shared figure to the figures directory."""
+        self.fig.tight_layout()
+        self.fig.savefig(self.figures_dir / filename, dpi=self.dpi, pil_kwargs={'optimize': False})
+    
+    def plot_all(self, rfm_data: pd.DataFrame, transactions: pd.DataFrame):
+        """Render all plots, in parallel worker processes when more than one CPU is available."""
+        # None means the plot reads rfm_data; only the retention plot needs transactions
+        jobs = [
+            ('plot_rfm_distributions', None),
+            ('plot_segment_characteristics', None),
+            ('plot_clv_distribution', None),
+            ('plot_retention_matrix', transactions)
+        ]
+        
+        max_workers = min(self.config['visualization']['n_jobs'], len(jobs), os.cpu_count() or 1)
+        if max_workers <= 1:
+            # Worker startup costs more than it saves without spare cores
+            for method_name, data in jobs:
+                getattr(self, method_name)(rfm_data if data is None else data)
+            return
+        
+        # Spawn rather than fork, forking after numba/BLAS thread pools have started is unsafe.
+        # The small rfm_data frame goes to each worker once through the initializer; the
+        # large transactions frame is sent only with the single task that reads it.
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_plot_worker,
+            initargs=(self.config_path, rfm_data)
+        ) as executor:
+            futures = [
+                executor.submit(_render_plot, method_name, data)
+                for method_name, data in jobs
+            ]
+            # Re-raise any plotting error from the workers
+            for future in futures:
+                future.result()
     
     def plot_rfm_distributions(self, rfm_data: pd.DataFrame):
         """Plot distributions of RFM metrics."""
-        fig, axes = plt.subplots(1, 3, figsize=self.figure_size)
+        axes = self._new_axes(1, 3)
         
         # Recency distribution
         sns.histplot(data=rfm_data, x='recency', ax=axes[0])
@@ -44,29 +122,26 @@ class CustomerAnalyticsVisualizer:
         axes[2].set_title('Monetary Distribution')
         axes[2].set_xlabel('Average Purchase Value')
         
-        plt.tight_layout()
-        plt.savefig(self.figures_dir / 'rfm_distributions.png', dpi=self.dpi)
-        plt.close()
+        self._save('rfm_distributions.png')
     
     def plot_segment_characteristics(self, rfm_data: pd.DataFrame):
         """Plot characteristics of customer segments."""
-        plt.figure(figsize=self.figure_size)
+        ax = self._new_axes()
         
-        segment_stats = rfm_data.groupby('Customer_Segment').agg({
+        segment_stats = rfm_data.groupby('Customer_Segment', observed=True).agg({
             'recency': 'mean',
             'frequency': 'mean',
             'monetary_avg': 'mean'
         }).round(2)
         
-        sns.heatmap(segment_stats, annot=True, cmap=self.config['visualization']['color_palette'])
-        plt.title('Segment Characteristics')
-        plt.tight_layout()
-        plt.savefig(self.figures_dir / 'segment_characteristics.png', dpi=self.dpi)
-        plt.close()
+        sns.heatmap(segment_stats, annot=True, cmap=self.config['visualization']['color_palette'], ax=ax)
+        ax.set_title('Segment Characteristics')
+        
+        self._save('segment_characteristics.png')
     
     def plot_clv_distribution(self, rfm_data: pd.DataFrame):
         """Plot CLV distribution and segments."""
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=self.figure_size)
+        ax1, ax2 = self._new_axes(2, 1)
         
         # CLV distribution
         sns.histplot(data=rfm_data, x='clv', ax=ax1)
@@ -76,11 +151,9 @@ class CustomerAnalyticsVisualizer:
         # CLV by segment
         sns.boxplot(data=rfm_data, x='clv_segment', y='clv', ax=ax2)
         ax2.set_title('CLV by Segment')
-        ax2.set_xticklabels(ax2.get_xticklabels(), rotation=45)
+        ax2.tick_params(axis='x', labelrotation=45)
         
-        plt.tight_layout()
-        plt.savefig(self.figures_dir / 'clv_analysis.png', dpi=self.dpi)
-        plt.close()
+        self._save('clv_analysis.png')
     
     def plot_retention_matrix(self, transactions: pd.DataFrame):
         """Create customer retention matrix."""
@@ -88,33 +161,39 @@ class CustomerAnalyticsVisualizer:
         cohort_data = self._prepare_cohort_data(transactions)
         retention_matrix = self._calculate_retention_matrix(cohort_data)
         
-        plt.figure(figsize=self.figure_size)
-        sns.heatmap(retention_matrix, annot=True, fmt='.0%', cmap='YlOrRd')
-        plt.title('Customer Retention by Cohort')
-        plt.xlabel('Months Since First Purchase')
-        plt.ylabel('Cohort')
+        ax = self._new_axes()
+        sns.heatmap(retention_matrix, annot=True, fmt='.0%', cmap='YlOrRd', ax=ax)
+        ax.set_title('Customer Retention by Cohort')
+        ax.set_xlabel('Months Since First Purchase')
+        ax.set_ylabel('Cohort')
         
-        plt.tight_layout()
-        plt.savefig(self.figures_dir / 'retention_matrix.png', dpi=self.dpi)
-        plt.close()
+        self._save('retention_matrix.png')
     
-    def _prepare_cohort_data(self, transactions: pd.DataFrame) -> pd.DataFrame:
+    @staticmethod
+    def _prepare_cohort_data(transactions: pd.DataFrame) -> pd.DataFrame:
         """Prepare transaction data for cohort analysis."""
-        transactions = transactions.copy()
-        transactions['cohort'] = transactions['transaction_date'].dt.to_period('M')
-        transactions['purchase_month'] = transactions['transaction_date'].dt.to_period('M')
+        purchase_month = transactions['transaction_date'].to_numpy().astype('datetime64[M]')
+        cohort_data = pd.DataFrame({
+            'customer_id': transactions['customer_id'].to_numpy(),
+            'purchase_month': purchase_month
+        })
+        
+        # Each customer's cohort is the month of their first purchase
+        cohort = cohort_data.groupby('customer_id', sort=False, observed=True)['purchase_month'].transform('min')
+        cohort_data['cohort'] = cohort
+        cohort_data['period_number'] = (
+            purchase_month - cohort.to_numpy().astype('datetime64[M]')
+        ).astype(np.int16)
         
-        return transactions
+        return cohort_data
     
-    def _calculate_retention_matrix(self, cohort_data: pd.DataFrame) -> pd.DataFrame:
+    @staticmethod
+    def _calculate_retention_matrix(cohort_data: pd.DataFrame) -> pd.DataFrame:
         """Calculate retention rates for cohort analysis."""
-        # Count unique customers by cohort and purchase month
-        grouping = cohort_data.groupby(['cohort', 'purchase_month'])['customer_id'].nunique()
+        # Count unique customers by cohort and months since first purchase
+        grouping = cohort_data.groupby(['cohort', 'period_number'], sort=False, observed=True)['customer_id'].nunique()
         cohort_data = grouping.reset_index()
-        
-        # Calculate periods since first purchase
-        cohort_data['period_number'] = (
-            cohort_data.purchase_month - cohort_data.cohort).apply(lambda x: x.n)
+        cohort_data['cohort'] = cohort_data['cohort'].dt.to_period('M')
         
         # Create retention matrix
         retention_matrix = cohort_data.pivot_table(
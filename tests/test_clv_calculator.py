@@ -0,0 +1,33 @@
+import pytest
+import pandas as pd
+from lifetimes.datasets import load_cdnow_summary_data_with_monetary_value
+from src.features.clv_calculator import CLVCalculator
+
+@pytest.fixture
+def rfm_data():
+    """Load the CDNOW summary data shipped with lifetimes in RFM column layout."""
+    data = load_cdnow_summary_data_with_monetary_value()
+    return data.rename(columns={'monetary_value': 'monetary_avg'}).reset_index()
+
+def test_save_and_load_models(rfm_data, tmp_path):
+    """Test that restored model parameters reproduce the fitted predictions."""
+    fitted = CLVCalculator()
+    fitted.fit_models(rfm_data)
+    fitted.save_models(tmp_path / 'models.pkl')
+    
+    restored = CLVCalculator()
+    restored.load_models(tmp_path / 'models.pkl')
+    
+    pd.testing.assert_series_equal(restored.bgf_model.params_, fitted.bgf_model.params_)
+    pd.testing.assert_series_equal(restored.ggf_model.params_, fitted.ggf_model.params_)
+    
+    expected = fitted.predict_clv(rfm_data.copy())
+    result = restored.predict_clv(rfm_data.copy())
+    pd.testing.assert_frame_equal(result, expected)
+
+def test_save_models_requires_fit(tmp_path):
+    """Test that saving unfitted models raises an error."""
+    calculator = CLVCalculator()
+    
+    with pytest.raises(ValueError):
+        calculator.save_models(tmp_path / 'models.pkl')
@@ -0,0 +1,80 @@
+import pytest
+import pandas as pd
+import yaml
+from datetime import datetime
+from src.data.customer_data import CustomerDataLoader, CATEGORY_DTYPE, GENDER_DTYPE
+
+@pytest.fixture
+def data_loader(tmp_path):
+    """Create a loader reading from a temporary data directory in small chunks."""
+    config = {
+        'data': {'chunksize': 3},
+        'paths': {'data_dir': str(tmp_path / 'data')}
+    }
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(yaml.safe_dump(config))
+    (tmp_path / 'data').mkdir()
+    
+    pd.DataFrame({
+        'customer_id': [1, 2, 3],
+        'first_purchase': ['2024-01-01', '2024-01-02', '2024-01-03'],
+        'age': [30.0, 40.0, 50.0],
+        'gender': ['F', 'M', 'F'],
+        'income_segment': ['High', 'Low', 'Medium']
+    }).to_csv(tmp_path / 'data' / 'customers.csv', index=False)
+    
+    # Unsorted dates, duplicates within and across chunks, and an unknown customer
+    pd.DataFrame({
+        'customer_id': [2, 1, 1, 3, 99, 2, 1, 3, 2, 99],
+        'transaction_date': [
+            '2024-03-01', '2024-01-10', '2024-01-10', '2024-02-15', '2024-01-05',
+            '2024-03-01', '2024-02-01', '2024-01-20', '2024-01-01', '2024-02-20'
+        ],
+        'amount': [20.0, 10.0, 10.0, 35.0, 5.0, 20.0, 15.0, 30.0, 25.0, 5.0],
+        'category': ['Food', 'Home', 'Home', 'Other', 'Food',
+                     'Food', 'Clothing', 'Electronics', 'Food', 'Home']
+    }).to_csv(tmp_path / 'data' / 'transactions.csv', index=False)
+    
+    return CustomerDataLoader(str(config_path))
+
+def test_load_and_preprocess_csv(data_loader):
+    """Test chunked CSV loading drops duplicates and unknown customers and sorts by date."""
+    customers_path, transactions_path = data_loader.source_paths()
+    assert customers_path.suffix == '.csv'
+    assert transactions_path.suffix == '.csv'
+    
+    customers, transactions = data_loader.load_data()
+    customers, transactions = data_loader.preprocess_data(customers, transactions)
+    
+    assert len(transactions) == 6
+    assert not transactions.duplicated().any()
+    assert 99 not in set(transactions['customer_id'])
+    assert transactions['transaction_date'].is_monotonic_increasing
+    assert list(transactions['transaction_date'].iloc[[0, -1]]) == [
+        datetime(2024, 1, 1), datetime(2024, 3, 1)
+    ]
+    
+    assert transactions['customer_id'].dtype == 'int32'
+    assert transactions['amount'].dtype == 'float32'
+    assert transactions['category'].dtype == CATEGORY_DTYPE
+    assert customers['gender'].dtype == GENDER_DTYPE
+
+def test_parquet_preferred_over_csv(data_loader, tmp_path):
+    """Test that Parquet copies are read instead of the CSV files when present."""
+    parquet_transactions = pd.DataFrame({
+        'customer_id': [3],
+        'transaction_date': [datetime(2024, 5, 1)],
+        'amount': [50.0],
+        'category': ['Home']
+    })
+    parquet_transactions.to_parquet(tmp_path / 'data' / 'transactions.parquet', index=False)
+    
+    customers_path, transactions_path = data_loader.source_paths()
+    assert customers_path.suffix == '.csv'
+    assert transactions_path.suffix == '.parquet'
+    
+    _, transactions = data_loader.load_data()
+    
+    assert len(transactions) == 1
+    assert transactions['customer_id'].iloc[0] == 3
+    assert transactions['category'].dtype == CATEGORY_DTYPE
@@ -1,7 +1,8 @@
 import pytest
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
-from src.features.rfm_metrics import RFMCalculator
+from src.features.rfm_metrics import RFMCalculator, _score
 
 @pytest.fixture
 def sample_transactions():
@@ -19,10 +20,10 @@ def sample_transactions():
         'amount': [100, 200, 150, 300, 400, 500]
     })
 
-def test_calculate_rfm():
+def test_calculate_rfm(sample_transactions):
     """Test RFM calculation functionality."""
     calculator = RFMCalculator()
-    transactions = sample_transactions()
+    transactions = sample_transactions
     analysis_date = datetime(2024, 2, 15)
     
     rfm = calculator.calculate_rfm(transactions, analysis_date)
@@ -36,10 +37,10 @@ def test_calculate_rfm():
     assert customer_1['monetary_sum'].iloc[0] == 300
     assert customer_1['monetary_avg'].iloc[0] == 150
 
-def test_add_rfm_scores():
+def test_add_rfm_scores(sample_transactions):
     """Test RFM scoring functionality."""
     calculator = RFMCalculator()
-    transactions = sample_transactions()
+    transactions = sample_transactions
     rfm = calculator.calculate_rfm(transactions)
     rfm_scored = calculator.add_rfm_scores(rfm)
     
@@ -48,13 +49,104 @@ def test_add_rfm_scores():
     assert all(1 <= score <= 4 for score in rfm_scored['F_score'])
     assert all(1 <= score <= 4 for score in rfm_scored['M_score'])
 
-def test_get_customer_segment():
+def test_get_customer_segment(sample_transactions):
     """Test customer segmentation functionality."""
     calculator = RFMCalculator()
-    transactions = sample_transactions()
+    transactions = sample_transactions
     rfm = calculator.calculate_rfm(transactions)
     rfm_scored = calculator.add_rfm_scores(rfm)
     segmented = calculator.get_customer_segment(rfm_scored)
     
     assert 'Customer_Segment' in segmented.columns
     assert all(isinstance(segment, str) for segment in segmented['Customer_Segment'])
+
+def test_numba_and_pandas_aggregation_match(sample_transactions, monkeypatch):
+    """Test that the compiled RFM kernel matches the pandas groupby fallback."""
+    from src.features import rfm_metrics
+    if rfm_metrics.njit is None:
+        pytest.skip("numba is not installed")
+    
+    # Missing amounts count as transactions but are skipped in sum and mean
+    transactions = pd.concat([
+        sample_transactions.astype({'amount': float}),
+        pd.DataFrame({
+            'customer_id': [1, 4],
+            'transaction_date': [datetime(2024, 1, 20), datetime(2024, 1, 25)],
+            'amount': [np.nan, np.nan]
+        })
+    ], ignore_index=True)
+    
+    calculator = RFMCalculator()
+    analysis_date = datetime(2024, 2, 15)
+    numba_rfm = calculator.calculate_rfm(transactions, analysis_date)
+    
+    monkeypatch.setattr(rfm_metrics, 'njit', None)
+    pandas_rfm = calculator.calculate_rfm(transactions, analysis_date)
+    
+    pd.testing.assert_frame_equal(
+        numba_rfm.sort_values('customer_id').reset_index(drop=True),
+        pandas_rfm.sort_values('customer_id').reset_index(drop=True)
+    )
+    
+    customer_1 = numba_rfm[numba_rfm['customer_id'] == 1].iloc[0]
+    assert customer_1['frequency'] == 3
+    assert customer_1['monetary_sum'] == 300
+    assert customer_1['monetary_avg'] == 150
+    
+    customer_4 = numba_rfm[numba_rfm['customer_id'] == 4].iloc[0]
+    assert customer_4['frequency'] == 1
+    assert customer_4['monetary_sum'] == 0
+    assert np.isnan(customer_4['monetary_avg'])
+
+def test_calculate_rfm_empty_transactions(sample_transactions):
+    """Test that RFM calculation handles an empty transaction table."""
+    calculator = RFMCalculator()
+    rfm = calculator.calculate_rfm(sample_transactions.iloc[:0], datetime(2024, 2, 15))
+    
+    assert len(rfm) == 0
+    assert list(rfm.columns) == ['customer_id', 'recency', 'frequency', 'monetary_sum', 'monetary_avg', 'T']
+
+def test_score_matches_qcut():
+    """Test that searchsorted scoring reproduces pd.qcut quartile labels."""
+    values = np.random.default_rng(0).lognormal(4, 1, 500)
+    edges = np.quantile(values, [0.25, 0.5, 0.75])
+    
+    expected = pd.qcut(values, q=4, labels=[1, 2, 3, 4]).astype(np.int8)
+    np.testing.assert_array_equal(_score(values, edges), expected)
+    
+    expected_reversed = pd.qcut(values, q=4, labels=[4, 3, 2, 1]).astype(np.int8)
+    np.testing.assert_array_equal(_score(values, edges, reverse=True), expected_reversed)
+
+def test_score_with_duplicate_edges():
+    """Test that duplicate quartile edges still score where pd.qcut would raise."""
+    values = np.array([1, 1, 1, 1, 1, 1, 2, 3, 5, 8])
+    edges = np.quantile(values, [0.25, 0.5, 0.75])
+    scores = _score(values, edges)
+    
+    # Edges are right-inclusive, so every value equal to the duplicated edge scores 1
+    np.testing.assert_array_equal(scores, [1, 1, 1, 1, 1, 1, 3, 4, 4, 4])
+    
+    with pytest.raises(ValueError):
+        pd.qcut(values, q=4, labels=[1, 2, 3, 4])
+
+def test_calculate_rfm_large_frequency():
+    """Test that transaction counts beyond the int16 range are not truncated."""
+    n_transactions = 40000
+    transactions = pd.DataFrame({
+        'customer_id': np.ones(n_transactions, dtype=np.int32),
+        'transaction_date': pd.date_range('2024-01-01', periods=n_transactions, freq='min'),
+        'amount': np.full(n_transactions, 10.0)
+    })
+    
+    rfm = RFMCalculator().calculate_rfm(transactions)
+    
+    assert rfm['frequency'].iloc[0] == n_transactions
+
+def test_calculate_rfm_long_day_spans(sample_transactions):
+    """Test that day spans beyond the int16 range are not truncated."""
+    analysis_date = datetime(2024, 2, 15) + timedelta(days=40000)
+    rfm = RFMCalculator().calculate_rfm(sample_transactions, analysis_date)
+    
+    customer_1 = rfm[rfm['customer_id'] == 1].iloc[0]
+    assert customer_1['recency'] == 40000 + 31
+    assert customer_1['T'] == 40000 + 45
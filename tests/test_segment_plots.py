@@ -0,0 +1,39 @@
+import pytest
+import pandas as pd
+from datetime import datetime
+from src.visualization.segment_plots import CustomerAnalyticsVisualizer
+
+@pytest.fixture
+def cohort_transactions():
+    """Create transactions spanning several months for two customers."""
+    return pd.DataFrame({
+        'customer_id': [1, 1, 1, 2, 2, 2],
+        'transaction_date': [
+            datetime(2024, 1, 5),
+            datetime(2024, 2, 20),
+            datetime(2024, 4, 1),
+            datetime(2024, 2, 1),
+            datetime(2024, 2, 28),
+            datetime(2024, 3, 15)
+        ],
+        'amount': [100, 200, 150, 300, 400, 500]
+    })
+
+def test_prepare_cohort_data(cohort_transactions):
+    """Test that cohorts are first-purchase months and periods count months since then."""
+    cohort_data = CustomerAnalyticsVisualizer._prepare_cohort_data(cohort_transactions)
+    
+    assert list(cohort_data['period_number']) == [0, 1, 3, 0, 0, 1]
+    assert list(cohort_data['cohort'].dt.to_period('M').astype(str)) == [
+        '2024-01', '2024-01', '2024-01', '2024-02', '2024-02', '2024-02'
+    ]
+
+def test_calculate_retention_matrix(cohort_transactions):
+    """Test retention rates per cohort and period."""
+    cohort_data = CustomerAnalyticsVisualizer._prepare_cohort_data(cohort_transactions)
+    retention_matrix = CustomerAnalyticsVisualizer._calculate_retention_matrix(cohort_data)
+    
+    assert list(retention_matrix.index.astype(str)) == ['2024-01', '2024-02']
+    assert list(retention_matrix.columns) == [0, 1, 3]
+    assert retention_matrix.loc[pd.Period('2024-01', 'M'), 3] == 1.0
+    assert pd.isna(retention_matrix.loc[pd.Period('2024-02', 'M'), 3])